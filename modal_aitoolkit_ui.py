@@ -1,44 +1,213 @@
+import os
+from pathlib import Path
+
 import modal
 
 cuda_version = "12.8.1"  # should be no greater than host CUDA version
-flavor = "cudnn-devel"  # includes full CUDA toolkit
+flavor = "base"  # CUDA runtime only; torch wheels bundle their own CUDA libs + cuDNN
 operating_sys = "ubuntu24.04"
 tag = f"{cuda_version}-{flavor}-{operating_sys}"
 
-image = (
-    modal.Image.from_registry(f"nvidia/cuda:{tag}", add_python="3.12")
-    .apt_install(
-        "git",
-        "curl",
-        "build-essential",
-        "ffmpeg",
-        "libsm6",
-        "libxext6"
+# Dipakai untuk build base image DAN untuk verifikasi base image prebuilt (AITK_BASE_IMAGE)
+python_version = "3.12"
+torch_version = "2.8.0+cu128"
+torchvision_version = "0.23.0+cu128"
+node_major = "20"
+
+aitk_repo = "https://github.com/ostris/ai-toolkit"
+# Isi dengan commit SHA (40 karakter) supaya build reproducible. Branch seperti "main"
+# di-resolve ke SHA SEKALI di layer tersendiri (/root/aitk-ref.sha); manifest dan
+# checkout sama-sama membaca SHA itu, jadi selalu dari tree yang sama. Ganti aitk_ref
+# untuk upgrade ai-toolkit. Checksum manifest dicek ulang setelah checkout sebagai backstop.
+aitk_ref = "main"
+aitk_sha_file = "/root/aitk-ref.sha"
+aitk_raw = f"https://raw.githubusercontent.com/ostris/ai-toolkit/$(cat {aitk_sha_file})"
+# ui/prisma/schema.prisma upstream hard-code `url = "file:../../aitk_db.db"`
+# (relatif ke ui/prisma), jadi DATABASE_URL tidak dipakai
+aitk_db_url = "file:../../aitk_db.db"
+aitk_db_path = "/root/ai-toolkit/aitk_db.db"
+# Kalau ai-toolkit di-vendor (mis. git submodule) di sebelah file ini, build dari
+# checkout lokal: tanpa network ke GitHub, dan layer hanya rebuild kalau isinya berubah.
+# Hanya dicek di mesin lokal: di dalam container /root/ai-toolkit selalu ada.
+aitk_local_dir = Path(__file__).parent / "ai-toolkit"
+use_local_aitk = modal.is_local() and aitk_local_dir.is_dir()
+
+# Cache npm + Next.js di luar image, supaya rebuild layer UI tetap warm
+build_cache = modal.Volume.from_name("aitoolkit-build-cache", create_if_missing=True)
+
+
+def run_ui_commands(*commands: str, use_next_cache: bool = True):
+    """
+    Jalankan command di /root/ai-toolkit/ui saat build image,
+    dengan cache npm dan .next/cache disimpan di volume build-cache.
+    use_next_cache=False untuk step yang tidak menjalankan Next.js build (mis. npm ci)
+    """
+    import shutil
+    import subprocess
+
+    ui_dir = "/root/ai-toolkit/ui"
+    next_cache = f"{ui_dir}/.next/cache"
+    saved_next_cache = "/mnt/build-cache/next"
+
+    env = os.environ.copy()
+    env["npm_config_cache"] = "/mnt/build-cache/npm"
+
+    # Restore cache Next.js dari build sebelumnya
+    if use_next_cache and os.path.isdir(saved_next_cache):
+        shutil.copytree(saved_next_cache, next_cache, dirs_exist_ok=True)
+
+    for command in commands:
+        subprocess.run(command, shell=True, cwd=ui_dir, env=env, check=True)
+
+    # Ganti cache di volume dengan hasil build ini (bukan merge, supaya file yang
+    # sudah dihapus Next.js tidak menumpuk), sekaligus buang dari layer image
+    if use_next_cache and os.path.isdir(next_cache):
+        shutil.rmtree(saved_next_cache, ignore_errors=True)
+        shutil.move(next_cache, saved_next_cache)
+    shutil.rmtree(f"{ui_dir}/node_modules/.cache", ignore_errors=True)
+    build_cache.commit()
+
+
+def add_aitk_files(image: modal.Image, *paths: str) -> modal.Image:
+    """
+    Tambahkan beberapa file ai-toolkit ke /root/ai-toolkit:
+    dari checkout lokal kalau ada, kalau tidak dari GitHub di SHA hasil resolve aitk_ref
+    """
+    if use_local_aitk:
+        for path in paths:
+            image = image.add_local_file(aitk_local_dir / path, f"/root/ai-toolkit/{path}", copy=True)
+        return image
+    return image.run_commands(
+        *(f"curl -fsSL --create-dirs {aitk_raw}/{path} -o /root/ai-toolkit/{path}" for path in paths)
     )
-    .run_commands(
-        # Install Node.js 20
-        "curl -fsSL https://deb.nodesource.com/setup_20.x | bash -",
-        "apt-get install -y nodejs",
-        # Clone AI Toolkit
-        "cd /root && git clone https://github.com/ostris/ai-toolkit.git",
-        "cd /root/ai-toolkit && git submodule update --init --recursive",
+
+
+# Opsional untuk CI: base image prebuilt (CUDA + apt + torch + Node.js) di registry,
+# di-build dengan `docker buildx --cache-from/--cache-to type=registry` supaya layer
+# berat di-reuse antar runner. Isi AITK_REGISTRY_SECRET kalau registry-nya private.
+# Image tersebut harus sudah berisi Python, torch/torchvision dan Node.js dengan versi
+# di atas, plus package apt yang sama (git, curl, ffmpeg, libsm6, libxext6);
+# dicek saat build supaya kedua jalur tidak diam-diam berbeda.
+base_image_ref = os.environ.get("AITK_BASE_IMAGE")
+registry_secret = os.environ.get("AITK_REGISTRY_SECRET")
+
+# Layer diurutkan dari yang paling jarang berubah ke yang paling sering,
+# supaya perubahan di ai-toolkit tidak memaksa rebuild torch/pip/npm.
+if base_image_ref:
+    image = modal.Image.from_registry(
+        base_image_ref,
+        secret=modal.Secret.from_name(registry_secret) if registry_secret else None,
     )
-    .pip_install(
-        "torch==2.8.0",
-        "torchvision==0.23.0+cu128",
-        index_url="https://download.pytorch.org/whl/cu128"
+else:
+    image = (
+        modal.Image.from_registry(f"nvidia/cuda:{tag}", add_python=python_version)
+        .apt_install(
+            "git",
+            "curl",
+            "ffmpeg",
+            "libsm6",
+            "libxext6"
+        )
+        .pip_install(
+            # Torch stack dalam satu install, dengan local version yang sama
+            f"torch=={torch_version}",
+            f"torchvision=={torchvision_version}",
+            index_url="https://download.pytorch.org/whl/cu128",
+            extra_options="--no-cache-dir",
+        )
+        .run_commands(
+            # Install Node.js
+            f"curl -fsSL https://deb.nodesource.com/setup_{node_major}.x | bash -",
+            "apt-get install -y --no-install-recommends nodejs && rm -rf /var/lib/apt/lists/*",
+        )
     )
-    .run_commands(
-        # Install Python dependencies
-        "cd /root/ai-toolkit && pip install -r requirements.txt",
-        # Install UI dependencies dan build SEKALI saja saat build image
-        "cd /root/ai-toolkit/ui && npm install --legacy-peer-deps",
-        # Setup Prisma database
-        "cd /root/ai-toolkit/ui && npx prisma generate",
-        "cd /root/ai-toolkit/ui && npx prisma db push",
-        # Build UI
-        "cd /root/ai-toolkit/ui && npm run build",
+
+# Cek versi torch stack persis sama dengan pin (dipakai di base dan setelah requirements)
+check_torch_stack = (
+    "python -c \"import torch, torchvision; print(torch.__version__, torchvision.__version__);"
+    f" assert torch.__version__ == '{torch_version}'; assert torchvision.__version__ == '{torchvision_version}'\""
+)
+
+# Verifikasi base image (terutama yang prebuilt dari registry) sesuai pin di atas
+image = image.run_commands(
+    f"python --version | grep -F 'Python {python_version}.'",
+    f"node --version | grep '^v{node_major}\\.'",
+    check_torch_stack,
+    # Package apt yang dipakai layer berikutnya (git, curl) dan saat training (ffmpeg, X libs)
+    "for c in git curl ffmpeg; do command -v $c || { echo \"$c tidak ada di base image\" >&2; exit 1; }; done",
+    "dpkg -s libsm6 libxext6 > /dev/null",
+)
+
+# Resolve aitk_ref ke commit SHA; semua layer ai-toolkit di bawah memakai SHA ini
+if not use_local_aitk:
+    image = image.run_commands(
+        f"if echo {aitk_ref} | grep -qxE '[0-9a-f]{{40}}'; then echo {aitk_ref};"
+        f" else git ls-remote {aitk_repo}.git {aitk_ref} | cut -f1 | head -n1; fi > {aitk_sha_file}",
+        f"test -s {aitk_sha_file} && cat {aitk_sha_file}",
+    )
+
+# Install Python dependencies (hanya butuh requirements.txt)
+image = add_aitk_files(image, "requirements.txt").run_commands(
+    "pip install --no-cache-dir -r /root/ai-toolkit/requirements.txt && rm -rf /root/.cache/pip",
+    # Pastikan requirements.txt tidak meng-upgrade / mengganti torch stack
+    check_torch_stack,
+)
+
+# Install UI dependencies (hanya butuh package manifests)
+image = add_aitk_files(
+    image.env({"NPM_CONFIG_UPDATE_NOTIFIER": "false", "NPM_CONFIG_FUND": "false"}),
+    "ui/package.json",
+    "ui/package-lock.json",
+).run_commands(
+    # Checksum manifest yang dipakai layer pip/npm, dicek lagi setelah checkout source
+    "sha256sum /root/ai-toolkit/requirements.txt /root/ai-toolkit/ui/package.json"
+    " /root/ai-toolkit/ui/package-lock.json > /root/aitk-manifests.sha256",
+).run_function(
+    run_ui_commands,
+    volumes={"/mnt/build-cache": build_cache},
+    args=("npm ci --legacy-peer-deps --prefer-offline --no-audit --no-fund --loglevel=error",),
+    kwargs={"use_next_cache": False},
+)
+
+# Source AI Toolkit di atas node_modules yang sudah ada
+if use_local_aitk:
+    image = image.add_local_dir(
+        aitk_local_dir,
+        "/root/ai-toolkit",
+        copy=True,
+        ignore=[
+            "**/.git", "**/node_modules", "**/__pycache__", "**/*.pyc", "**/.next",
+            # Hasil run lokal (training output, dataset, database UI)
+            "output", "datasets", "aitk_db.db*",
+        ],
     )
+else:
+    # Shallow checkout (tanpa history)
+    image = image.run_commands(
+        "cd /root/ai-toolkit && git init -q",
+        f"cd /root/ai-toolkit && git remote add origin {aitk_repo}.git",
+        f"cd /root/ai-toolkit && git fetch --depth 1 origin $(cat {aitk_sha_file})",
+        "cd /root/ai-toolkit && git checkout -f FETCH_HEAD",
+        "cd /root/ai-toolkit && git submodule update --init --recursive --depth 1",
+    )
+
+image = image.run_function(
+    run_ui_commands,
+    volumes={"/mnt/build-cache": build_cache},
+    args=(
+        # Source harus cocok dengan manifest yang dipakai install dependencies
+        "sha256sum --quiet -c /root/aitk-manifests.sha256",
+        # Setup Prisma database
+        "npx prisma generate",
+        # Gagal dengan pesan jelas kalau upstream memindahkan lokasi database
+        f"grep -qF '{aitk_db_url}' prisma/schema.prisma"
+        f" || (echo 'schema.prisma tidak lagi memakai {aitk_db_url}' >&2 && exit 1)",
+        "npx prisma db push",
+        # Template database kosong untuk inisialisasi volume saat runtime
+        f"cp {aitk_db_path} /root/prisma-template.db",
+        # Build UI SEKALI saja saat build image
+        "npm run build",
+    ),
 )
 
 app = modal.App("ai-toolkit-ui")
@@ -55,58 +224,80 @@ volumes = {
     ),
 }
 
+# Set KEEP_WARM=1 saat deploy untuk selalu standby 1 container GPU (ada biaya idle)
+keep_warm = os.environ.get("KEEP_WARM", "0") == "1"
+
+# Directory yang dibutuhkan AI Toolkit di dalam volumes
+output_dirs = [
+    "/mnt/output/datasets",
+    "/mnt/output/jobs",
+    "/mnt/output/models",
+    "/mnt/cache",
+]
+# Database Prisma juga harus persist di volume
+db_dir = "/mnt/output/database"
+# Bump versinya kalau output_dirs berubah, supaya ui_server membuat ulang directories
+setup_marker = "/mnt/output/.setup_v1"
+
+def _force_symlink(src: str, dst: str):
+    """
+    Seperti `rm -rf dst && ln -sf src dst`, tapi tanpa spawn process.
+    Symlink dibuat di path sementara lalu di-os.replace supaya atomic.
+    """
+    import shutil
+    
+    if os.path.isdir(dst) and not os.path.islink(dst):
+        shutil.rmtree(dst)
+    tmp = f"{dst}.tmp"
+    try:
+        os.remove(tmp)
+    except FileNotFoundError:
+        pass
+    os.symlink(src, tmp)
+    os.replace(tmp, dst)
+
 @app.function(
     image=image,
     gpu="L40S",  # Minimal 24GB VRAM untuk FLUX training
-    timeout=3600,  # 24 jam
+    timeout=86400,  # 24 jam
     volumes=volumes,
-    allow_concurrent_inputs=100,
+    min_containers=1 if keep_warm else 0,
+    scaledown_window=600,  # Tunggu 10 menit idle sebelum container dimatikan
 )
+@modal.concurrent(max_inputs=100)
 @modal.web_server(8675, startup_timeout=300)
 def ui_server():
     """
     Jalankan AI Toolkit Next.js UI (dengan API routes built-in)
     """
+    import shutil
     import subprocess
-    import os
     
     # Setup symlinks untuk volumes
-    subprocess.run(["rm", "-rf", "/root/ai-toolkit/output"], check=False)
-    subprocess.run(["rm", "-rf", "/root/.cache"], check=False)
-    subprocess.run(["ln", "-sf", "/mnt/output", "/root/ai-toolkit/output"], check=True)
-    subprocess.run(["ln", "-sf", "/mnt/cache", "/root/.cache"], check=True)
-    
-    # Buat directories yang diperlukan
-    os.makedirs("/mnt/output/datasets", exist_ok=True)
-    os.makedirs("/mnt/output/jobs", exist_ok=True)
-    os.makedirs("/mnt/output/models", exist_ok=True)
-    os.makedirs("/mnt/cache", exist_ok=True)
-    
-    # Set permissions
-    subprocess.run(["chmod", "-R", "777", "/mnt/output"], check=False)
-    subprocess.run(["chmod", "-R", "777", "/mnt/cache"], check=False)
-    
-    # Setup Prisma database symlink (database juga harus persist)
-    db_dir = "/mnt/output/database"
+    _force_symlink("/mnt/output", "/root/ai-toolkit/output")
+    _force_symlink("/mnt/cache", "/root/.cache")
+    
+    # Buat directories yang diperlukan (skip kalau volume sudah pernah di-setup)
+    if not os.path.exists(setup_marker):
+        for d in output_dirs:
+            os.makedirs(d, exist_ok=True)
+        open(setup_marker, "w").close()
+    
+    # Setup Prisma database symlink (database juga harus persist).
+    # Selalu dibuat: directory ini boleh dihapus manual untuk reset database.
     os.makedirs(db_dir, exist_ok=True)
-    subprocess.run(["rm", "-rf", "/root/ai-toolkit/ui/prisma/dev.db"], check=False)
-    subprocess.run(["rm", "-rf", "/root/ai-toolkit/ui/prisma/dev.db-journal"], check=False)
+    try:
+        os.remove(f"{aitk_db_path}-journal")
+    except FileNotFoundError:
+        pass
     
-    # Jika database belum ada, inisialisasi
+    # Jika database belum ada, copy template yang sudah di-push saat build image
     if not os.path.exists(f"{db_dir}/dev.db"):
         print("Initializing database...")
-        subprocess.run([
-            "npx", "prisma", "db", "push"
-        ], cwd="/root/ai-toolkit/ui", env=os.environ, check=False)
-        # Copy ke volume
-        subprocess.run([
-            "cp", "/root/ai-toolkit/ui/prisma/dev.db", f"{db_dir}/dev.db"
-        ], check=False)
+        shutil.copy("/root/prisma-template.db", f"{db_dir}/dev.db")
     
     # Link database dari volume
-    subprocess.run([
-        "ln", "-sf", f"{db_dir}/dev.db", "/root/ai-toolkit/ui/prisma/dev.db"
-    ], check=True)
+    _force_symlink(f"{db_dir}/dev.db", aitk_db_path)
     
     # Set environment variables
     env = os.environ.copy()
@@ -115,7 +306,6 @@ def ui_server():
     env["OUTPUT_DIR"] = "/root/ai-toolkit/output"
     env["PYTHONPATH"] = "/root/ai-toolkit"
     env["PORT"] = "8675"
-    env["DATABASE_URL"] = "file:./prisma/dev.db"
     
     # Optional: Set auth token untuk keamanan
     # Uncomment baris ini dan ganti dengan password yang kuat
@@ -124,7 +314,7 @@ def ui_server():
     print("=" * 70)
     print("Starting AI Toolkit UI...")
     print("Output directory:", env["OUTPUT_DIR"])
-    print("Database:", env["DATABASE_URL"])
+    print("Database:", aitk_db_path, "->", f"{db_dir}/dev.db")
     print("UI will be available on port 8675")
     print("=" * 70)
     
@@ -132,18 +322,42 @@ def ui_server():
     # Next.js akan handle API routes secara otomatis
     os.chdir("/root/ai-toolkit/ui")
     
+    # stdout/stderr sengaja di-inherit (bukan PIPE): log langsung masuk ke Modal,
+    # dan server tidak hang karena pipe buffer 64KB penuh tanpa ada yang membaca
     subprocess.Popen(
         ["npm", "run", "start"],
         env=env,
         cwd="/root/ai-toolkit/ui",
     )
 
-# Helper function untuk download results
-@app.function(
-    image=image,
-    volumes=volumes,
-    timeout=3600,
-)
+# Helper function untuk upload datasets (jalan lokal, tanpa container)
+@app.local_entrypoint()
+def upload_files(local_path: str, remote_path: str):
+    """
+    Upload datasets atau files langsung ke volume aitoolkit-output
+    
+    Usage:
+    modal run modal_aitoolkit_ui.py::upload_files \
+      --local-path ./my_dataset \
+      --remote-path datasets/my_dataset
+    """
+    src = Path(local_path)
+    dst = f"/{remote_path.strip('/')}"
+    
+    if not src.exists():
+        raise FileNotFoundError(f"Local path tidak ditemukan: {local_path}")
+    
+    # batch_upload mengirim banyak file paralel dalam satu commit volume
+    with volumes["/mnt/output"].batch_upload(force=True) as batch:
+        if src.is_dir():
+            batch.put_directory(src, dst)
+        else:
+            batch.put_file(src, dst)
+    
+    print(f"✓ Uploaded: {local_path} -> {dst}")
+
+# Helper function untuk download results (jalan lokal, tanpa container)
+@app.local_entrypoint()
 def download_files(remote_path: str, local_path: str):
     """
     Download trained models atau output files
@@ -153,23 +367,107 @@ def download_files(remote_path: str, local_path: str):
       --remote-path my_lora/my_lora_000001000.safetensors \
       --local-path ./trained_models/my_lora.safetensors
     """
-    import shutil
-    from pathlib import Path
+    from concurrent.futures import ThreadPoolExecutor
+    from modal.exception import NotFoundError
+    from modal.volume import FileEntryType
     
-    src = Path(f"/mnt/output/{remote_path}")
+    volume = volumes["/mnt/output"]
+    # "" berarti root volume (mis. --remote-path /)
+    remote_path = remote_path.strip("/")
     dst = Path(local_path)
     
-    if not src.exists():
+    def fetch(entry_path: str, file_dst: Path):
+        file_dst.parent.mkdir(parents=True, exist_ok=True)
+        with open(file_dst, "wb") as f:
+            for chunk in volume.read_file(entry_path):
+                f.write(chunk)
+    
+    # Stream listing dari volume, download file secara paralel
+    with ThreadPoolExecutor(max_workers=16) as pool:
+        futures = []
+        try:
+            for entry in volume.iterdir(remote_path or "/", recursive=True):
+                if entry.type != FileEntryType.FILE:
+                    continue
+                if entry.path == remote_path:
+                    # Single file: seperti shutil.copy2, copy ke dalam directory kalau dst directory
+                    file_dst = dst / Path(entry.path).name if dst.is_dir() else dst
+                else:
+                    file_dst = dst / Path(entry.path).relative_to(remote_path)
+                futures.append(pool.submit(fetch, entry.path, file_dst))
+        except NotFoundError:
+            raise FileNotFoundError(f"Remote path tidak ditemukan: {remote_path}") from None
+        for future in futures:
+            future.result()
+    
+    if not futures:
         raise FileNotFoundError(f"Remote path tidak ditemukan: {remote_path}")
     
-    if src.is_dir():
-        dst.mkdir(parents=True, exist_ok=True)
-        shutil.copytree(src, dst, dirs_exist_ok=True)
-        print(f"✓ Downloaded directory: {src} -> {local_path}")
-    else:
-        dst.parent.mkdir(parents=True, exist_ok=True)
-        shutil.copy2(src, dst)
-        print(f"✓ Downloaded file: {src} -> {local_path}")
+    print(f"✓ Downloaded {len(futures)} file(s): {remote_path} -> {local_path}")
+
+# Helper function untuk lihat isi volume output (jalan lokal, tanpa container)
+@app.local_entrypoint()
+def list_files(remote_path: str = "/"):
+    """
+    List files di volume aitoolkit-output, dicetak sambil di-stream
+    
+    Usage:
+    modal run modal_aitoolkit_ui.py::list_files --remote-path my_lora
+    """
+    from modal.exception import NotFoundError
+    from modal.volume import FileEntryType
+    
+    count = 0
+    total_size = 0
+    try:
+        for entry in volumes["/mnt/output"].iterdir(remote_path, recursive=True):
+            if entry.type != FileEntryType.FILE:
+                continue
+            count += 1
+            total_size += entry.size
+            print(f"{entry.size / 1024 / 1024:10.2f} MB  {entry.path}")
+    except NotFoundError:
+        raise FileNotFoundError(f"Remote path tidak ditemukan: {remote_path}") from None
+    
+    print(f"\n✓ {count} file(s), {total_size / 1024 / 1024 / 1024:.2f} GB")
+
+# Function untuk download model weights ke cache volume SEKALI saja
+@app.function(
+    image=image,
+    volumes=volumes,
+    secrets=[modal.Secret.from_name("huggingface")],
+    timeout=7200,
+)
+def preload_models(
+    repo_id: str = "black-forest-labs/FLUX.1-dev",
+    # AI Toolkit hanya load layout diffusers (transformer/, vae/, ...), jadi file
+    # single-file checkpoint di root repo (~24GB) tidak perlu ikut di-download
+    ignore_patterns: str = "flux1-dev.safetensors,ae.safetensors",
+):
+    """
+    Download model weights dari Hugging Face ke volume aitoolkit-cache,
+    supaya training pertama tidak perlu menunggu download belasan GB
+    
+    Usage:
+    modal run modal_aitoolkit_ui.py::preload_models
+    modal run modal_aitoolkit_ui.py::preload_models \
+      --repo-id black-forest-labs/FLUX.1-schnell \
+      --ignore-patterns flux1-schnell.safetensors,ae.safetensors
+    """
+    from huggingface_hub import snapshot_download
+    
+    # Sama dengan ~/.cache/huggingface/hub di ui_server (/root/.cache -> /mnt/cache)
+    cache_dir = "/mnt/cache/huggingface/hub"
+    
+    print(f"Downloading {repo_id} ke {cache_dir}...")
+    path = snapshot_download(
+        repo_id,
+        cache_dir=cache_dir,
+        token=os.environ["HF_TOKEN"],
+        ignore_patterns=[p for p in ignore_patterns.split(",") if p] or None,
+    )
+    volumes["/mnt/cache"].commit()
+    print(f"✓ Preloaded: {path}")
 
 # Function untuk check dan setup directories
 @app.function(
@@ -183,20 +481,10 @@ def setup_directories():
     Usage:
     modal run modal_aitoolkit_ui.py::setup_directories
     """
-    import os
-    from pathlib import Path
-    
-    directories = [
-        "/mnt/output/datasets",
-        "/mnt/output/jobs", 
-        "/mnt/output/models",
-        "/mnt/cache"
-    ]
-    
     print("\n🔧 Setting up directories...\n")
     print("-" * 70)
     
-    for dir_path in directories:
+    for dir_path in (*output_dirs, db_dir):
         path = Path(dir_path)
         path.mkdir(parents=True, exist_ok=True)
         
@@ -209,6 +497,9 @@ def setup_directories():
         else:
             print(f"✗ {dir_path} - FAILED")
     
+    # Sama dengan ui_server: tandai volume sudah di-setup
+    open(setup_marker, "w").close()
+    
     print("-" * 70)
     print("✓ Directory setup complete!\n")
 
@@ -216,6 +507,9 @@ def setup_directories():
 def main():
     """
     Deploy AI Toolkit UI ke Modal
+    
+    Usage:
+    modal run modal_aitoolkit_ui.py::main
     """
     print("\n" + "="*70)
     print("🚀 Ostris AI Toolkit UI on Modal.com")
@@ -224,18 +518,30 @@ def main():
     print("\n📦 GPU & Resources:")
     print("  - GPU: L40S (48GB VRAM)")
     print("  - Port: 8675 (UI + API)")
-    print("  - Timeout: 1 hours")
+    print("  - Timeout: 24 hours")
     print("  - Volumes: aitoolkit-output, aitoolkit-cache")
+    print("  - Scaledown: 10 menit idle (KEEP_WARM=1 untuk 1 container standby)")
     
     print("\n🔧 Deployment Commands:")
+    print("  Info:      modal run modal_aitoolkit_ui.py::main")
     print("  Deploy:    modal deploy modal_aitoolkit_ui.py")
     print("  Dev mode:  modal serve modal_aitoolkit_ui.py")
+    print("  Warm:      KEEP_WARM=1 modal deploy modal_aitoolkit_ui.py")
+    print("  CI:        AITK_BASE_IMAGE=ghcr.io/you/aitk-base:tag modal deploy modal_aitoolkit_ui.py")
+    
+    print("\n📤 Upload Datasets:")
+    print("  modal run modal_aitoolkit_ui.py::upload_files \\")
+    print("    --local-path ./my_dataset \\")
+    print("    --remote-path datasets/my_dataset")
     
     print("\n📥 Download Results:")
     print("  modal run modal_aitoolkit_ui.py::download_files \\")
     print("    --remote-path my_lora/checkpoint.safetensors \\")
     print("    --local-path ./my_lora.safetensors")
     
+    print("\n📂 List Files:")
+    print("  modal run modal_aitoolkit_ui.py::list_files --remote-path my_lora")
+    
     print("\n🔧 Setup Directories (jalankan setelah deploy):")
     print("  modal run modal_aitoolkit_ui.py::setup_directories")
     
@@ -250,14 +556,14 @@ def main():
     print("  - Training jobs berjalan di background")
     print("  - Semua output tersimpan di Modal Volume")
     
-    print("\n🔑 Hugging Face Setup (Optional):")
-    print("  Untuk FLUX.1-dev, set HF token sebagai Modal secret:")
+    print("\n🔑 Hugging Face Setup (buat sebelum deploy):")
+    print("  Secret ini dipakai preload_models (FLUX.1-dev butuh HF token):")
     print("  modal secret create huggingface HF_TOKEN=your_token")
+    print("  Preload weights ke cache volume (sekali saja):")
+    print("  modal run modal_aitoolkit_ui.py::preload_models")
     
     print("\n🌐 Access URL:")
     print("  Setelah deploy, Modal akan memberikan URL seperti:")
     print("  https://username--ai-toolkit-ui-ui-server.modal.run")
     
     print("\n" + "="*70 + "\n")
-    
-    print("\n" + "="*70 + "\n")